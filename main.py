@@ -3,143 +3,947 @@ import logging
 import json
 import os
 import re
+import codecs
+import io
+import mmap
+import functools
+import importlib.util
 import chardet
-from faker import Faker
 from datetime import datetime
-import uuid
+import random
+import secrets
+import tempfile
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+try:
+    import re2 as _re  # Google RE2 for user-supplied patterns: linear time in the input size.
+except ImportError:
+    _re = re
+
+try:
+    import numpy as np  # Optional, vectorizes date_to_timestamp.
+except ImportError:
+    np = None
+
+try:
+    import hyperscan  # Optional SIMD multi-pattern matcher, scans for the default date pattern.
+except ImportError:
+    hyperscan = None
+
+try:
+    import orjson  # Optional, fast serialization of the name_to_id lookup table.
+except ImportError:
+    orjson = None
+
+try:
+    import liburing  # Optional io_uring bindings, used by --io_backend uring.
+except ImportError:
+    liburing = None
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+_LOG = logging.getLogger(__name__)  # Logger for the anonymizer, configured once at import.
+_LOG.setLevel(logging.INFO)
+
+# Default patterns, compiled once at import time.  These are known not to backtrack badly, so they
+# stay on the stdlib engine: the RE2 wrapper's per-match overhead makes it several times slower
+# than 're' on match-dense input.
+_DATE_RE = re.compile(r'\d{4}-\d{2}-\d{2}')
+_NAME_RE = re.compile(r'\b[A-Z][a-z]+\s[A-Z][a-z]+\b')
+_EMAIL_RE = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b') #Basic email regex
+_PHONE_RE = re.compile(r'\b\d{3}[-\.\s]??\d{3}[-\.\s]??\d{4}\b') #Default US phone number
+_ADDRESS_RE = re.compile(r'\d+\s[A-Za-z]+\s[A-Za-z]+') #Simple address regex; can be customized.
+
+# Format type -> key of the pattern it rewrites.
+_FORMAT_TYPES = {
+    'date_to_timestamp': 'date',
+    'name_to_id': 'name',
+    'email_to_fake': 'email',
+    'phone_to_fake': 'phone',
+    'address_to_fake': 'address',
+}
+
+# Pattern key -> Faker provider used by the matching *_to_fake transform.
+_FAKE_PROVIDERS = {
+    'email': 'email',
+    'phone': 'phone_number',
+    'address': 'address',
+}
+
+_DATE_SPLIT_RE = re.compile(f'({_DATE_RE.pattern})')  # Same as _DATE_RE, captured for re.split.
+
+_DEFAULT_PATTERNS = {
+    'date': _DATE_RE,
+    'name': _NAME_RE,
+    'email': _EMAIL_RE,
+    'phone': _PHONE_RE,
+    'address': _ADDRESS_RE,
+}
+
+# re.ASCII variants, used when the data is pure ASCII and has none of _UNICODE_SPACES.  On such input
+# they match exactly what the Unicode-aware patterns do, but \d, \b and \s become plain byte-range
+# checks (about 2x faster).
+_ASCII_DATE_SPLIT_RE = re.compile(_DATE_SPLIT_RE.pattern, re.ASCII)
+_ASCII_PATTERNS = {key: re.compile(pattern.pattern, re.ASCII) for key, pattern in _DEFAULT_PATTERNS.items()}
+
+# ASCII characters that \s matches in Unicode mode but not under re.ASCII.
+_UNICODE_SPACES = '\x1c\x1d\x1e\x1f'
+
+# An inline flag group that sets re.UNICODE, e.g. (?u) or (?iu:...); it cannot be mixed with re.ASCII.
+_UNICODE_FLAG_RE = re.compile(r'\(\?[aiLmsx]*u')
+
+
+def _ascii_safe(pattern_str):
+    """
+    Tells whether compiling a user pattern with re.ASCII leaves its matches on ASCII data unchanged.
+
+    Patterns that set their own Unicode flag are left alone, as are non-ASCII ones, whose
+    case-insensitive matching of ASCII letters can depend on Unicode case folding.
+    """
+    return pattern_str.isascii() and not _UNICODE_FLAG_RE.search(pattern_str)
+
+
+def _local_tz_is_utc():
+    """
+    Tells whether naive datetimes are interpreted as UTC, i.e. datetime.timestamp() agrees with UTC arithmetic.
+
+    time.timezone and friends only describe the zone's current rules, and zones such as
+    Africa/Monrovia or Atlantic/Reykjavik are UTC today but had other offsets in the past.  Only
+    the UTC zone itself is named 'UTC', so the name is checked as well.
+    """
+    return time.tzname == ('UTC', 'UTC') and time.timezone == 0 and time.altzone == 0 and not time.daylight
+
+
+_LOCAL_TZ_IS_UTC = _local_tz_is_utc()
+
+
+def _sub_stream(pattern, repl, data, out_write):
+    """Like pattern.sub(repl, data), but hands each piece to out_write instead of building the result in memory."""
+    last = 0
+    for match in pattern.finditer(data):
+        start = match.start()
+        if start > last:
+            out_write(data[last:start])
+        out_write(repl(match))
+        last = match.end()
+    if last < len(data):
+        out_write(data[last:])
+
+
+_STREAM_BLOCK_SIZE = 1024 * 1024  # Characters per block when output is built block by block.
+# Blocks with more dates than one per this many characters (and at least _SCAN_MIN_DATES) are split
+# with re instead of a native scanner: per-match Python work then outweighs what the scan saves.
+_SCAN_CHARS_PER_DATE = 128
+_SCAN_MIN_DATES = 64
+
+
+def _line_blocks(data, size):
+    """
+    Yields consecutive slices of data of about size characters, each ending just after a newline.
+
+    Matches of patterns that can't span a newline (like the default date one) never straddle two blocks.
+    """
+    start = 0
+    while start < len(data):
+        end = data.find('\n', start + size)
+        end = len(data) if end == -1 else end + 1
+        yield data[start:end]
+        start = end
+
+
+def _splice(data, spans, replacements, out_write):
+    """Writes data with each (start, end) span replaced by the matching entry of replacements."""
+    last = 0
+    for (start, end), replacement in zip(spans, replacements):
+        if start > last:
+            out_write(data[last:start])
+        out_write(replacement)
+        last = end
+    if last < len(data):
+        out_write(data[last:])
+
+
+@functools.lru_cache(maxsize=None)
+def _hyperscan_db(pattern_bytes):
+    """Compiles a single-pattern Hyperscan database that also reports match start offsets."""
+    db = hyperscan.Database()
+    db.compile(expressions=[pattern_bytes], ids=[0], flags=[hyperscan.HS_FLAG_SOM_LEFTMOST])
+    return db
+
+
+_JIT_MIN_SIZE = 16 * 1024 * 1024  # Below this, importing Numba (~0.3s) costs more than the scan saves.
+
+
+@functools.lru_cache(maxsize=None)
+def _numba_date_scanner():
+    """
+    Returns a Numba-compiled scanner for the default date pattern, or None if Numba isn't installed.
+
+    Numba is imported (and the scanner compiled, or loaded from its on-disk cache) on first use
+    only, since importing it takes a noticeable fraction of a second.
+    """
+    try:
+        import numba
+    except ImportError:
+        return None
+
+    @numba.njit(cache=True)
+    def scan_dates(buf):
+        # Start offsets of the non-overlapping \d{4}-\d{2}-\d{2} matches in an ASCII byte array,
+        # in the same leftmost-first order re.finditer reports them.
+        n = buf.shape[0]
+        starts = np.empty(n // 10 + 1, np.int64)
+        count = 0
+        i = 0
+        while i <= n - 10:
+            if (buf[i + 4] == 45 and buf[i + 7] == 45
+                    and 48 <= buf[i] <= 57 and 48 <= buf[i + 1] <= 57 and 48 <= buf[i + 2] <= 57
+                    and 48 <= buf[i + 3] <= 57 and 48 <= buf[i + 5] <= 57 and 48 <= buf[i + 6] <= 57
+                    and 48 <= buf[i + 8] <= 57 and 48 <= buf[i + 9] <= 57):
+                starts[count] = i
+                count += 1
+                i += 10
+            else:
+                i += 1
+        return starts[:count]
+
+    return scan_dates
+
+
+def _hyperscan_date_spans(data, max_dates=None):
+    """
+    Finds the (start, end) spans of _DATE_RE in ASCII-only data with Hyperscan.
+
+    Hyperscan reports every match rather than re's leftmost non-overlapping ones, so overlapping
+    matches are dropped here.  For a fixed-length pattern like the date one, and with byte offsets
+    equal to character offsets on ASCII input, that gives exactly the spans re.finditer would.
+
+    Returns:
+        list: The spans, or None if there are more than max_dates of them (the scan stops there).
+    """
+    spans = []
+    last_end = 0
+
+    def on_match(pattern_id, start, end, flags, context):
+        nonlocal last_end
+        if start >= last_end:  # Matches arrive in end-offset order.
+            spans.append((start, end))
+            last_end = end
+            return max_dates is not None and len(spans) > max_dates  # True stops the scan.
+
+    try:
+        _hyperscan_db(_DATE_RE.pattern.encode('ascii')).scan(data.encode('ascii'), match_event_handler=on_match)
+    except hyperscan.ScanTerminated:
+        return None
+    return spans
+
+
+def _numba_date_spans(data, max_dates=None):
+    """
+    Finds the (start, end) spans of _DATE_RE in ASCII-only data with the Numba scanner.
+
+    Returns:
+        list: The spans, or None if there are more than max_dates of them, or Numba is unavailable.
+    """
+    scan_dates = _numba_date_scanner()
+    if scan_dates is None:  # Found but failed to import.
+        return None
+    starts = scan_dates(np.frombuffer(data.encode('ascii'), dtype=np.uint8))
+    if max_dates is not None and len(starts) > max_dates:
+        return None
+    return [(start, start + 10) for start in starts.tolist()]
+
+
+def _is_iso_date_shape(date_str):
+    """Tells whether date_str is exactly 'DDDD-DD-DD' with ASCII digits."""
+    return (len(date_str) == 10 and date_str[4] == '-' and date_str[7] == '-' and date_str.isascii()
+            and (date_str[0:4] + date_str[5:7] + date_str[8:10]).isdigit())
+
+
+def _iso_timestamps_numpy(date_strs):
+    """
+    Converts a batch of 'YYYY-MM-DD' strings to UTC-midnight Unix timestamps in three NumPy ops.
+
+    Returns:
+        dict: Mapping of each date string to its timestamp string, or an empty dict if any of
+        them is not a valid date (the caller then handles them one at a time).
+    """
+    # Year 0 is valid for NumPy but not for datetime/strptime.
+    if not date_strs or any(date_str.startswith('0000') for date_str in date_strs):
+        return {}
+    try:
+        days = np.array(date_strs, dtype='datetime64[D]')
+    except ValueError:
+        return {}
+    seconds = days.astype('datetime64[s]').astype(np.int64)
+    return dict(zip(date_strs, seconds.astype(str).tolist()))
+
+
+def _parse_iso_date(date_str):
+    """
+    Parses a 'YYYY-MM-DD' string without going through strptime's format interpreter.
+
+    Falls back to strptime for anything that isn't exactly that shape (e.g. matches of a
+    custom date_regex), so the result is always what strptime(date_str, '%Y-%m-%d') would give.
+
+    Raises:
+        ValueError: If the string is not a valid date.
+    """
+    if _is_iso_date_shape(date_str):
+        return datetime(int(date_str[0:4]), int(date_str[5:7]), int(date_str[8:10]))
+    return datetime.strptime(date_str, '%Y-%m-%d')
+
+
+_DAYS_IN_MONTH = (0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+
+def _days_from_civil(year, month, day):
+    """
+    Days since 1970-01-01 for a proleptic Gregorian date.
+
+    Howard Hinnant's constant-time algorithm: shifts the year to start in March, so the leap day
+    falls last and month lengths follow a fixed (153 * m + 2) // 5 progression.
+    """
+    year -= month <= 2
+    era = year // 400
+    year_of_era = year - era * 400
+    day_of_year = (153 * ((month + 9) % 12) + 2) // 5 + day - 1
+    day_of_era = year_of_era * 365 + year_of_era // 4 - year_of_era // 100 + day_of_year
+    return era * 146097 + day_of_era - 719468
+
+
+def _iso_utc_timestamp(date_str):
+    """
+    Converts 'YYYY-MM-DD' to the Unix timestamp of its UTC midnight, without building a datetime.
+
+    Accepts and rejects exactly what datetime.strptime(date_str, '%Y-%m-%d') does; strings that
+    aren't exactly that shape are handed to strptime itself.
+
+    Raises:
+        ValueError: If the string is not a valid date.
+    """
+    if not _is_iso_date_shape(date_str):
+        date_object = datetime.strptime(date_str, '%Y-%m-%d')
+        return _days_from_civil(date_object.year, date_object.month, date_object.day) * 86400
+    o = ord
+    year = (o(date_str[0]) - 48) * 1000 + (o(date_str[1]) - 48) * 100 + (o(date_str[2]) - 48) * 10 + o(date_str[3]) - 48
+    month = (o(date_str[5]) - 48) * 10 + o(date_str[6]) - 48
+    day = (o(date_str[8]) - 48) * 10 + o(date_str[9]) - 48
+    if not 1 <= month <= 12 or year == 0:
+        raise ValueError(f"Invalid date: {date_str}")
+    leap_day = month == 2 and year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
+    if not 1 <= day <= _DAYS_IN_MONTH[month] + leap_day:
+        raise ValueError(f"Invalid date: {date_str}")
+    return _days_from_civil(year, month, day) * 86400
+
+
+_ID_BATCH = 256  # Name IDs generated per os.urandom call.
+
+
+def _random_ids(count):
+    """Returns count random 128-bit hex IDs, reading all the randomness in one os.urandom call."""
+    hex_str = os.urandom(16 * count).hex()
+    return [hex_str[i:i + 32] for i in range(0, 32 * count, 32)]
+
+
+_LEADING_FLAGS_RE = re.compile(r'\(\?([aiLmsux]+)\)')  # A global inline flag group such as (?i).
+# A numbered group reference, \1 or (?(1)...), not itself escaped by a preceding backslash.
+_NUMBERED_REF_RE = re.compile(r'(?<!\\)(?:\\\\)*\\[1-9]|\(\?\(\d')
+
+
+def _embeddable(key, pattern_str):
+    """
+    Rewrites a pattern so it can be used as one alternative of a combined regex.
+
+    Global inline flags are only allowed at the very start of a regex, so leading ones such as
+    (?i) are scoped to the pattern instead, as (?i:...).  Numbered backreferences would point at
+    the wrong group once the alternatives before it add their own, so they are rejected.
+
+    Raises:
+        ValueError: If the pattern refers to a group by number.
+    """
+    if _NUMBERED_REF_RE.search(pattern_str):
+        message = (f"{key}_regex uses a numbered backreference, which cannot be combined with other format types; "
+                   "use a named group and (?P=name) instead")
+        _LOG.error(message)
+        raise ValueError(message)
+    flags = ''
+    pos = 0
+    match = _LEADING_FLAGS_RE.match(pattern_str)
+    while match:
+        flags += match.group(1)
+        pos = match.end()
+        match = _LEADING_FLAGS_RE.match(pattern_str, pos)
+    if not flags:
+        return pattern_str
+    rest = pattern_str[pos:]
+    if 'x' in flags:
+        rest += '\n'  # Ends a trailing verbose-mode comment, which would otherwise swallow the ')'.
+    return f'(?{flags}:{rest})'
+
+
+@functools.lru_cache(maxsize=32)
+def _get_compiled(pattern_str, fancy=False, flags=0):
+    """
+    Compiles a user-supplied regex, caching it across instances with identical configs.
+
+    User patterns go through RE2 (when installed) so they run in linear time and cannot
+    backtrack catastrophically.  With fancy=True the Python 're' engine is used instead,
+    for patterns that need backreferences or lookarounds.  flags only apply to 're' patterns.
+    """
+    if fancy or _re is re:
+        return re.compile(pattern_str, flags)
+    return _re.compile(pattern_str)
+
+
 class DataFormatAnonymizer:
     """
     Anonymizes data by converting it to a different but functionally equivalent data format.
     """
 
+    logger = _LOG  # Shared by all instances.
+
     def __init__(self, data, format_type, config=None):
         """
         Initializes the DataFormatAnonymizer.
 
         Args:
             data (str): The data to be anonymized.
-            format_type (str): The type of anonymization to apply (e.g., 'date_to_timestamp', 'name_to_id').
+            format_type (str or list): The type of anonymization to apply (e.g., 'date_to_timestamp', 'name_to_id'),
+                or a list of them to apply together.
             config (dict, optional): Configuration options for the anonymization process. Defaults to None.
+
+        Raises:
+            ValueError: If a format type is not supported.
         """
         self.data = data
         self.format_type = format_type
         self.config = config or {}
-        self.fake = Faker()
+        self.fake = None  # Faker instance, created on first use by a *_to_fake transform.
         self.id_lookup = {} # Store mapping of original values to anonymized IDs.
-        self.logger = logging.getLogger(__name__)  # Get a logger specific to this class
-        self.logger.setLevel(logging.INFO)
+        self._ascii = data.isascii()
+        # Whether the re.ASCII patterns can stand in for the Unicode ones on this data.
+        self._ascii_regex = self._ascii and not any(char in data for char in _UNICODE_SPACES)
+        # RE2's \w, \d, \s and \b are ASCII-only, and its \s also skips \v, so it only stands in for
+        # 're' on data where that makes no difference.
+        self._re2_safe = self._ascii_regex and '\v' not in data
+        self._out_write = None  # When set, substitutions are streamed here instead of returned.
 
-    def anonymize(self):
+        # Resolve the transform once, so anonymize() doesn't re-examine format_type on every call.
+        format_types = [format_type] if isinstance(format_type, str) else list(dict.fromkeys(format_type))
+        if not format_types:
+            _LOG.error("No format type given")
+            raise ValueError("No format type given")
+        for name in format_types:
+            if name not in self._DISPATCH:
+                _LOG.error(f"Unsupported format type: {name}")
+                raise ValueError(f"Unsupported format type: {name}")
+        self._format_types = format_types
+        self._patterns = self._build_patterns([_FORMAT_TYPES[name] for name in format_types])
+        self._run = self._DISPATCH[format_types[0]] if len(format_types) == 1 else DataFormatAnonymizer._anonymize_combined
+        # Built up front so patterns that can't be combined are rejected here rather than in anonymize().
+        self._combined = (self._combined_pattern([_FORMAT_TYPES[name] for name in format_types])
+                          if len(format_types) > 1 else None)
+
+    def _build_patterns(self, keys):
+        """
+        Resolves the compiled pattern for each of keys, preferring '<x>_regex' overrides from config.
+
+        Overrides for transforms that aren't being run are never compiled, so a config shared
+        between runs may hold patterns that only some of them can use.
+
+        Returns:
+            dict: Mapping of pattern name (e.g. 'date') to a compiled regex.
+        """
+        fancy = bool(self.config.get('allow_fancy_regex')) or not self._re2_safe
+        defaults = _ASCII_PATTERNS if self._ascii_regex else _DEFAULT_PATTERNS
+        patterns = {}
+        for key in keys:
+            override = self.config.get(f'{key}_regex')
+            patterns[key] = _get_compiled(override, fancy, self._regex_flags([override])) if override else defaults[key]
+        return patterns
+
+    def _regex_flags(self, pattern_strs):
+        """Returns re.ASCII if it can be added to all of pattern_strs on this data, else 0."""
+        return re.ASCII if self._ascii_regex and all(map(_ascii_safe, pattern_strs)) else 0
+
+    def _substitute(self, pattern, repl):
+        """
+        Applies repl to every match of a compiled pattern.
+
+        Returns:
+            str: The substituted data, or None if the output is being streamed to self._out_write.
+        """
+        if self._out_write is not None:
+            _sub_stream(pattern, repl, self.data, self._out_write)
+            return None
+        return pattern.sub(repl, self.data)
+
+    def anonymize(self, out_write=None):
         """
         Anonymizes the data based on the specified format type.
 
+        format_type may also be a list of format types, in which case all of them are applied
+        in a single pass over the data (see _anonymize_combined).
+
+        Args:
+            out_write (callable, optional): If given (e.g. a text file's write method), the anonymized
+                data is written through it piece by piece rather than built up as one string.
+
         Returns:
-            str: The anonymized data.
+            str: The anonymized data, or None when out_write is given.
         """
 
+        self._out_write = out_write
         try:
-            if self.format_type == 'date_to_timestamp':
-                return self.date_to_timestamp()
-            elif self.format_type == 'name_to_id':
-                return self.name_to_id()
-            elif self.format_type == 'email_to_fake':
-                return self.email_to_fake()
-            elif self.format_type == 'phone_to_fake':
-                return self.phone_to_fake()
-            elif self.format_type == 'address_to_fake':
-                return self.address_to_fake()
-            else:
-                self.logger.error(f"Unsupported format type: {self.format_type}")
-                raise ValueError(f"Unsupported format type: {self.format_type}")
+            return self._run(self)
         except Exception as e:
-            self.logger.exception(f"Anonymization failed: {e}")
+            _LOG.exception(f"Anonymization failed: {e}")
             raise
-    
+        finally:
+            self._out_write = None
+
+    def anonymize_to(self, out):
+        """
+        Anonymizes the data straight into a file object, so the full result is never held in memory.
+
+        Args:
+            out: A text file (io.TextIOBase), or a binary one, which then receives UTF-8.
+        """
+        if isinstance(out, io.TextIOBase):
+            self.anonymize(out_write=out.write)
+            return
+        wrapper = io.TextIOWrapper(out, encoding='utf-8', newline='')
+        try:
+            self.anonymize(out_write=wrapper.write)
+            wrapper.flush()
+        finally:
+            wrapper.detach()  # Leave the caller's stream open.
+
+    def _combined_pattern(self, keys):
+        """
+        Builds one alternation of the named patterns, e.g. (?P<date>...)|(?P<name>...).
+
+        Alternatives are tried in the order given, so earlier transforms win where patterns overlap.
+
+        Raises:
+            ValueError: If a pattern cannot be embedded in the alternation (see _embeddable).
+        """
+        patterns = [self._patterns[key] for key in keys]
+        group_names = set(keys)
+        for key, pattern in zip(keys, patterns):
+            if group_names & set(pattern.groupindex):
+                _LOG.error(f"Group names in {key}_regex clash with another pattern or a format type name")
+                raise ValueError(f"Group names in {key}_regex clash with another pattern or a format type name")
+            group_names.update(pattern.groupindex)
+        combined = '|'.join(f'(?P<{key}>{_embeddable(key, pattern.pattern)})' for key, pattern in zip(keys, patterns))
+        # Stay on the stdlib engine unless one of the alternatives was compiled with RE2.
+        fancy = bool(self.config.get('allow_fancy_regex')) or all(isinstance(p, re.Pattern) for p in patterns)
+        overrides = [self.config[f'{key}_regex'] for key in keys if self.config.get(f'{key}_regex')]
+        return _get_compiled(combined, fancy, self._regex_flags(overrides))
+
+    def _anonymize_combined(self):
+        """
+        Applies several transforms in one pass, dispatching each match on the group that matched.
+        """
+        keys = [_FORMAT_TYPES[format_type] for format_type in self._format_types]
+        pattern = self._combined
+
+        counts = dict.fromkeys(keys, 0)
+        if any(key in _FAKE_PROVIDERS for key in keys):
+            # Fake pools are sized from what the combined pattern actually matches.
+            for match in pattern.finditer(self.data):
+                counts[match.lastgroup] += 1
+
+        replacers = {}
+        for key in keys:
+            if key == 'date':
+                convert = self._date_converter()
+                replacers[key] = lambda match, convert=convert: convert(match.group(0))
+            elif key == 'name':
+                replacers[key] = self._name_replacer()
+            else:
+                replacers[key] = self._fake_replacer(key, counts[key])
+
+        def dispatch(match):
+            return replacers[match.lastgroup](match)
+
+        return self._substitute(pattern, dispatch)
+
+    def _date_converter(self):
+        """
+        Returns a memoized function converting one date string to a timestamp string.
+
+        Dates that fail to parse are logged once and returned unchanged.
+        """
+        date_format = self.config.get('date_format', '%Y-%m-%d')
+        if date_format != '%Y-%m-%d':
+            to_timestamp = lambda date_str: int(datetime.strptime(date_str, date_format).timestamp())
+        elif _LOCAL_TZ_IS_UTC:
+            to_timestamp = _iso_utc_timestamp  # Pure integer arithmetic, valid since local time is UTC.
+        else:
+            to_timestamp = lambda date_str: int(_parse_iso_date(date_str).timestamp())
+        cache = {}  # Each distinct date string is only parsed once.
+
+        def convert(date_str):
+            timestamp = cache.get(date_str)
+            if timestamp is None:
+                try:
+                    timestamp = str(to_timestamp(date_str))
+                except ValueError:
+                    if _LOG.isEnabledFor(logging.WARNING):
+                        _LOG.warning(f"Invalid date format encountered: {date_str}")  # Log invalid date format
+                    timestamp = date_str  # Return the original date if parsing fails
+                cache[date_str] = timestamp
+            return timestamp
+
+        convert.cache = cache
+        return convert
+
     def date_to_timestamp(self):
         """
         Converts dates in the data to Unix timestamps.  Assumes dates are in YYYY-MM-DD format,
         but could be configured with config
         """
-        date_format = self.config.get('date_format', '%Y-%m-%d')
+        convert = self._date_converter()
+        default = self.config.get('date_format', '%Y-%m-%d') == '%Y-%m-%d' and not self.config.get('date_regex')
 
-        def replace_date(match):
-            date_str = match.group(0)
-            try:
-                date_object = datetime.strptime(date_str, date_format)
-                timestamp = str(int(date_object.timestamp()))
-                return timestamp
-            except ValueError:
-                self.logger.warning(f"Invalid date format encountered: {date_str}")  # Log invalid date format
-                return date_str  # Return the original date if parsing fails
-
-        pattern = r'\d{4}-\d{2}-\d{2}' #Default regex, can be customized with config
-        pattern = self.config.get('date_regex', pattern) #Override default regex if provided in config
-
-        return re.sub(pattern, replace_date, self.data)
-    
-    def name_to_id(self):
+        if not default:
+            def replace_date(match):
+                return convert(match.group(0))
+
+            return self._substitute(self._patterns['date'], replace_date)
+
+        # NumPy's datetime64 is UTC-based, which matches naive datetime.timestamp() only when local
+        # time is UTC.
+        vectorize = np is not None and _LOCAL_TZ_IS_UTC
+
+        # On ASCII input the default pattern can be located by a native scanner, far quicker than
+        # re where dates are sparse; only the matches themselves then cost Python-level work.
+        scan = None
+        if self._ascii:
+            if hyperscan is not None:
+                scan = _hyperscan_date_spans
+            elif len(self.data) >= _JIT_MIN_SIZE and importlib.util.find_spec('numba') is not None:
+                scan = _numba_date_spans
+        # split() with a capturing group yields [text, date, text, date, ..., text] in one C-level pass.
+        split = (_ASCII_DATE_SPLIT_RE if self._ascii_regex else _DATE_SPLIT_RE).split
+
+        # The data goes through in line-aligned blocks, so only one block's pieces are held at a time.
+        pieces = []
+        out_write = self._out_write if self._out_write is not None else pieces.append
+        # Numba takes a while to import, so it is only brought in once a block has shown the dates
+        # are sparse enough for it to pay off.
+        use_scan = scan is _hyperscan_date_spans
+        for block in _line_blocks(self.data, _STREAM_BLOCK_SIZE):
+            max_dates = max(len(block) // _SCAN_CHARS_PER_DATE, _SCAN_MIN_DATES)
+            spans = scan(block, max_dates) if use_scan else None
+            if spans is None:
+                parts = split(block)
+                dates = parts[1::2]
+                # Back off to re.split while dates are dense, and try the scanner again once they thin out.
+                use_scan = scan is not None and len(dates) <= max_dates
+            else:
+                dates = [block[start:end] for start, end in spans]
+            if vectorize:
+                new_dates = [d for d in set(dates) if d not in convert.cache and _is_iso_date_shape(d)]
+                convert.cache.update(_iso_timestamps_numpy(new_dates))
+            replacements = [convert(date_str) for date_str in dates]
+            if spans is None:
+                parts[1::2] = replacements
+            else:
+                parts = []
+                _splice(block, spans, replacements, parts.append)
+            out_write(''.join(parts))
+        return None if self._out_write is not None else ''.join(pieces)
+
+    def _name_replacer(self):
         """
-        Replaces names in the data with anonymized IDs and stores the mapping in a lookup table.
+        Returns the substitution callback for names, assigning IDs to unseen ones as they are met.
+
+        IDs are 32 hex characters (128 random bits), drawn _ID_BATCH at a time from os.urandom.
         """
+        lookup = self.id_lookup
+        spare_ids = []
+
         def replace_name(match):
             name = match.group(0)
-            if name not in self.id_lookup:
-                self.id_lookup[name] = str(uuid.uuid4())  # Generate a UUID for the ID
-            return self.id_lookup[name]
+            anon_id = lookup.get(name)
+            if anon_id is None:
+                if not spare_ids:
+                    spare_ids.extend(_random_ids(_ID_BATCH))
+                anon_id = lookup[name] = spare_ids.pop()
+            return anon_id
+
+        return replace_name
+
+    def name_to_id(self):
+        """
+        Replaces names in the data with anonymized IDs and stores the mapping in a lookup table.
+        """
+        return self._substitute(self._patterns['name'], self._name_replacer())
+
+    def _get_fake(self):
+        """
+        Returns the Faker instance, creating it on first use.
 
-        name_regex = r'\b[A-Z][a-z]+\s[A-Z][a-z]+\b'
-        name_regex = self.config.get("name_regex", name_regex)
+        Importing faker loads hundreds of provider modules, so transforms that don't need it never pay for it.
+        """
+        if self.fake is None:
+            from faker import Faker
+            self.fake = Faker()
+            if self.config.get('seed') is not None:
+                self.fake.seed_instance(self.config['seed'])  # Reproducible fake values across runs.
+        return self.fake
+
+    def _fast_email_generator(self):
+        """
+        Returns a cheap stand-in for Faker's email provider, used when config sets 'fast_email'.
+
+        Like Faker, it is reproducible when config sets 'seed'; otherwise addresses come from secrets.
+        """
+        seed = self.config.get('seed')
+        if seed is None:
+            return lambda: f"{secrets.token_hex(4)}@example.com"
+        rng = random.Random(seed)
+        return lambda: f"{rng.getrandbits(32):08x}@example.com"
+
+    def _fake_replacer(self, key, count):
+        """
+        Pre-generates count fake values for the named pattern and returns a callback handing them out.
+
+        Generating the pool up front lets the Faker provider be resolved once and called in a
+        tight loop, instead of being dispatched from inside the substitution callback.
+        """
+        if key == 'email' and self.config.get('fast_email'):
+            generate = self._fast_email_generator()
+        else:
+            generate = getattr(self._get_fake(), _FAKE_PROVIDERS[key])
+        pool = iter([generate() for _ in range(count)])
+
+        def replace_fake(match):
+            return next(pool)
+
+        return replace_fake
+
+    def _count(self, key):
+        """Counts the matches of the named pattern."""
+        return sum(1 for _ in self._patterns[key].finditer(self.data))
 
-        anonymized_data = re.sub(name_regex, replace_name, self.data)
-        return anonymized_data
-    
     def email_to_fake(self):
          """Replaces email addresses with fake email addresses."""
-         email_regex = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b' #Basic email regex
-         email_regex = self.config.get('email_regex', email_regex) #Override the default if provided
-         def replace_email(match):
-            return self.fake.email()
-
-         return re.sub(email_regex, replace_email, self.data)
+         replace_email = self._fake_replacer('email', self._count('email'))
+         return self._substitute(self._patterns['email'], replace_email)
 
     def phone_to_fake(self):
         """Replaces phone numbers with fake phone numbers."""
-        phone_regex = r'\b\d{3}[-\.\s]??\d{3}[-\.\s]??\d{4}\b' #Default US phone number
-        phone_regex = self.config.get('phone_regex', phone_regex)
-        def replace_phone(match):
-            return self.fake.phone_number()
-        return re.sub(phone_regex, replace_phone, self.data)
+        replace_phone = self._fake_replacer('phone', self._count('phone'))
+        return self._substitute(self._patterns['phone'], replace_phone)
 
     def address_to_fake(self):
         """Replaces addresses with fake addresses."""
-        address_regex = r'\d+\s[A-Za-z]+\s[A-Za-z]+' #Simple address regex; can be customized.
-        address_regex = self.config.get('address_regex', address_regex)
+        replace_address = self._fake_replacer('address', self._count('address'))
+        return self._substitute(self._patterns['address'], replace_address)
+
+    # Format type -> transform method, looked up once in __init__.
+    _DISPATCH = {
+        'date_to_timestamp': date_to_timestamp,
+        'name_to_id': name_to_id,
+        'email_to_fake': email_to_fake,
+        'phone_to_fake': phone_to_fake,
+        'address_to_fake': address_to_fake,
+    }
+
+
+_CHUNK_SIZE = 64 * 1024  # Read granularity for input files.
+_SNIFF_LIMIT = 1024 * 1024  # Never feed more than this many leading bytes to chardet.
+_URING_QUEUE_DEPTH = 64  # Reads kept in flight by the io_uring backend.
+_URING_BLOCK_SIZE = 128 * 1024  # Size of each io_uring read request.
 
-        def replace_address(match):
-            return self.fake.address()
-        return re.sub(address_regex, replace_address, self.data)
 
+def _iter_chunks(f, buf):
+    """Yields successive chunks of a binary file object, appending each one to buf."""
+    while True:
+        chunk = f.read(_CHUNK_SIZE)
+        if not chunk:
+            return
+        buf += chunk
+        yield chunk
 
-def detect_encoding(file_path):
-    """Detects the encoding of a file."""
-    with open(file_path, 'rb') as f:
-        raw_data = f.read()
-    result = chardet.detect(raw_data)
-    return result['encoding']
 
-def load_data(input_path):
+# Checked longest first, since the UTF-32-LE BOM starts with the UTF-16-LE one.
+_BOMS = (
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+
+
+def _sniff_encoding(chunks):
+    """
+    Detects the encoding from the leading chunks of a file.
+
+    Consumes chunks only until _SNIFF_LIMIT bytes have been seen, so the caller can keep draining
+    the same iterator without reading the start of the file twice.  A BOM or an all-ASCII prefix
+    is recognised directly; chardet only runs on non-ASCII input without a BOM.
+    """
+    sniff = bytearray()
+    for chunk in chunks:
+        sniff += chunk
+        if len(sniff) >= _SNIFF_LIMIT:
+            break
+    for bom, encoding in _BOMS:
+        if sniff.startswith(bom):
+            return encoding
+    if sniff.isascii():
+        return 'ascii'
+    return chardet.detect(sniff)['encoding']
+
+
+def _read_uring(file_path):
+    """
+    Reads a whole file with io_uring, keeping up to _URING_QUEUE_DEPTH reads in flight.
+
+    Raises:
+        ImportError: If the liburing bindings are not installed.
+        OSError: If the ring cannot be set up or a read fails.
+    """
+    if liburing is None:
+        raise ImportError("liburing is not installed")
+
+    fd = os.open(file_path, os.O_RDONLY)
+    try:
+        size = os.fstat(fd).st_size
+        ring = liburing.Ring()
+        cqe = liburing.Cqe()
+        liburing.trap_error(liburing.io_uring_queue_init(_URING_QUEUE_DEPTH, ring))
+        try:
+            files = liburing.FileIndex([fd])  # Registered fd: skips per-request file refcounting.
+            liburing.io_uring_register_files(ring, files)
+            pending = deque((offset, min(offset + _URING_BLOCK_SIZE, size))
+                            for offset in range(0, size, _URING_BLOCK_SIZE))
+            in_flight = {}
+            parts = {}
+            while pending or in_flight:
+                while pending and len(in_flight) < _URING_QUEUE_DEPTH:
+                    offset, stop = pending.popleft()
+                    block = bytearray(stop - offset)
+                    sqe = liburing.io_uring_get_sqe(ring)
+                    liburing.io_uring_prep_read(sqe, 0, block, offset)
+                    liburing.io_uring_sqe_set_flags(sqe, liburing.IOSQE_ASYNC | liburing.IOSQE_FIXED_FILE)
+                    liburing.io_uring_sqe_set_data64(sqe, offset)
+                    in_flight[offset] = block
+                liburing.io_uring_submit(ring)
+                liburing.io_uring_wait_cqe(ring, cqe)
+                while True:
+                    # Completions are consumed one at a time: peek/seen follow the ring's head
+                    # across wrap-around, which indexing past cqe[0] does not.
+                    entry = cqe[0]
+                    res = liburing.trap_error(entry.res)
+                    offset = liburing.io_uring_cqe_get_data64(entry)
+                    liburing.io_uring_cqe_seen(ring, entry)
+                    block = in_flight.pop(offset)
+                    if res < len(block):
+                        if res == 0:
+                            raise OSError(f"Unexpected end of file while reading {file_path}")
+                        pending.append((offset + res, offset + len(block)))  # Resubmit the short read's tail.
+                        del block[res:]
+                    parts[offset] = block
+                    try:
+                        liburing.io_uring_peek_cqe(ring, cqe)
+                    except BlockingIOError:  # No more completions ready.
+                        break
+            liburing.io_uring_unregister_files(ring)
+        finally:
+            liburing.io_uring_queue_exit(ring)
+    finally:
+        os.close(fd)
+    return b''.join(parts[offset] for offset in sorted(parts))
+
+
+def _decode(raw, encoding, sniffed=True):
+    """
+    Decodes raw file contents, normalizing newlines the way text-mode reads do.
+
+    raw may be any buffer (bytes, bytearray, mmap); it is decoded in place, without copying it first.
+    An encoding the caller asked for explicitly (sniffed=False) is used strictly, with no fallback.
+    """
+    if not sniffed:
+        data = str(raw, encoding)
+    else:
+        if encoding is None or encoding.lower() == 'ascii':
+            # Only a prefix was sniffed, so decode as the ASCII superset in case
+            # non-ASCII bytes appear further into the file.
+            encoding = 'utf-8'
+        try:
+            data = str(raw, encoding)
+        except UnicodeDecodeError as e:
+            # The guess came from a prefix only; let chardet look at the bytes that failed to decode.
+            fallback = chardet.detect(raw[e.start:e.start + _SNIFF_LIMIT])['encoding']
+            if not fallback or fallback.lower() in (encoding.lower(), 'ascii'):
+                raise
+            logging.warning(f"Input is not valid {encoding}, decoding as {fallback} instead")
+            data = str(raw, fallback)
+    if '\r' in data:  # Match the universal-newline translation of text-mode reads.
+        data = data.replace('\r\n', '\n').replace('\r', '\n')
+    return data
+
+
+def load_data(input_path, io_backend='sync', encoding=None):
     """
     Loads data from a file, handling encoding detection.
+
+    The file is read exactly once; only its first _SNIFF_LIMIT bytes are used for detection.
+    Regular files are memory-mapped and decoded straight from the mapping, so no intermediate
+    copy of the raw bytes is held alongside the decoded text.
+
+    Args:
+        input_path (str): Path to the input file.
+        io_backend (str, optional): 'sync' for plain blocking reads, or 'uring' to read through
+            io_uring on Linux.  'uring' falls back to 'sync' when io_uring is unavailable.
+        encoding (str, optional): The input's encoding, if known.  Skips detection entirely.
     """
     try:
-        encoding = detect_encoding(input_path)
-        with open(input_path, 'r', encoding=encoding) as f:
-            data = f.read()
-        return data
+        sniffed = encoding is None
+        if not sniffed:
+            codecs.lookup(encoding)  # Reject unknown encodings before reading anything.
+        if io_backend == 'uring':
+            try:
+                raw = _read_uring(input_path)
+            except FileNotFoundError:
+                raise
+            except Exception as e:  # Unavailable, or failed partway: the sync path reads it from scratch.
+                logging.warning(f"io_uring backend failed, falling back to sync reads: {e}")
+            else:
+                if sniffed:
+                    encoding = _sniff_encoding([memoryview(raw)[:_SNIFF_LIMIT]])
+                return _decode(raw, encoding, sniffed)
+
+        with open(input_path, 'rb') as f:
+            try:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (ValueError, OSError):
+                mapped = None  # Empty file, or not mappable (e.g. a pipe): read it in chunks instead.
+            if mapped is not None:
+                with mapped:
+                    if hasattr(mapped, 'madvise'):
+                        mapped.madvise(mmap.MADV_SEQUENTIAL)
+                    if sniffed:
+                        encoding = _sniff_encoding([mapped[:_SNIFF_LIMIT]])
+                    return _decode(mapped, encoding, sniffed)
+
+            buf = bytearray()
+            chunks = _iter_chunks(f, buf)
+            if sniffed:
+                encoding = _sniff_encoding(chunks)
+            for _ in chunks:  # Read the rest of the file.
+                pass
+        return _decode(buf, encoding, sniffed)
     except FileNotFoundError:
         logging.error(f"Input file not found: {input_path}")
         raise
@@ -148,16 +952,153 @@ def load_data(input_path):
         raise
 
 
-def save_data(data, output_path):
+def save_lookup(id_lookup, output_path, lookup_file=None):
     """
-    Saves data to a file.
+    Saves the name to ID lookup table next to the output file, as <output base>_lookup.json.
+
+    The table is serialized to UTF-8 bytes in one go (by orjson when installed, otherwise as compact
+    JSON) and written with a single call.
+
+    Args:
+        lookup_file (str, optional): Where to save the table instead of the default name.
     """
+    if lookup_file is None:
+        lookup_file = os.path.splitext(output_path)[0] + '_lookup.json' #Lookup table saved to same base name.
     try:
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(data)
+        if orjson is not None:
+            payload = orjson.dumps(id_lookup, option=orjson.OPT_INDENT_2)
+        else:
+            payload = json.dumps(id_lookup, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        with open(lookup_file, 'wb') as f:
+            f.write(payload)
+        logging.info(f"Name to ID lookup table saved to {lookup_file}")
     except Exception as e:
+        logging.error(f"Error saving lookup table: {e}")
+
+
+def _output_mode(output_path):
+    """The permissions for output_path: those of the file it replaces, or what open() would give a new one."""
+    try:
+        return os.stat(output_path).st_mode & 0o7777
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+
+def anonymize_file(input_path, output_path, format_types, config, io_backend='sync', encoding=None,
+                   lookup_file=None):
+    """
+    Anonymizes a single file and writes the result, plus the lookup table for name_to_id.
+
+    Only takes picklable arguments, since it also runs in worker processes in directory mode.
+
+    Args:
+        input_path (str): Path to the input file.
+        output_path (str): Path to the output file.
+        format_types (list): The format types to apply.
+        config (dict): Configuration options for the anonymization process.
+        io_backend (str, optional): Passed through to load_data.
+        encoding (str, optional): Passed through to load_data.
+        lookup_file (str, optional): Passed through to save_lookup.
+
+    Returns:
+        dict: The name to ID lookup table (empty unless name_to_id is applied).
+    """
+    data = load_data(input_path, io_backend, encoding)
+
+    format_type = format_types[0] if len(format_types) == 1 else format_types
+    anonymizer = DataFormatAnonymizer(data, format_type, config)
+    # Write replacements as they are produced, instead of holding a second full copy of the data. They go
+    # to a temporary file beside the output, which replaces it only once complete: a failure midway then
+    # leaves any existing output (or the input, if it is the same file) untouched.
+    target = os.path.realpath(output_path)  # Through a symlink, replace the file it points to.
+    directory, base = os.path.split(target)
+    tmp_path = None
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f'.{base}.', suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8', newline='', buffering=1 << 20) as f:
+            os.chmod(tmp_path, _output_mode(target))  # mkstemp creates the file as 0600.
+            anonymizer.anonymize_to(f)
+        os.replace(tmp_path, target)
+    except OSError as e:
         logging.error(f"Error writing to output file: {e}")
         raise
+    finally:
+        if tmp_path is not None and os.path.exists(tmp_path):  # Only still there if something failed.
+            os.remove(tmp_path)
+    logging.info(f"Anonymization complete.  Output written to {output_path}")
+
+    if 'name_to_id' in format_types and anonymizer.id_lookup:
+        save_lookup(anonymizer.id_lookup, output_path, lookup_file)
+    return anonymizer.id_lookup
+
+
+def _init_worker(log_level):
+    """Applies the CLI log level in a worker process."""
+    logging.getLogger().setLevel(log_level)
+
+
+def anonymize_directory(input_dir, output_dir, format_types, config, io_backend='sync', log_level='INFO',
+                        encoding=None):
+    """
+    Anonymizes every file directly inside input_dir into output_dir, one process per CPU.
+
+    Files are independent and the work is CPU-bound Python, so they are spread over processes
+    rather than threads.  With name_to_id, each file gets its own lookup table, named after the
+    full file name (<name>_lookup.json) so that e.g. a.txt and a.csv don't share one.  The tables
+    are then merged into <output_dir>_lookup.json, next to output_dir, which maps each name to the
+    ID it got in every file it appears in.
+
+    Returns:
+        int: The number of files that failed.
+
+    Raises:
+        ValueError: If the directories are the same, or a lookup table would overwrite an input or output file.
+    """
+    if os.path.realpath(input_dir) == os.path.realpath(output_dir):
+        raise ValueError("Output directory must differ from the input directory")
+    names = sorted(entry.name for entry in os.scandir(input_dir) if entry.is_file())
+    if not names:
+        logging.warning(f"No files to anonymize in {input_dir}")
+        return 0
+    lookup_files = {}
+    merged_file = os.path.abspath(output_dir) + '_lookup.json'
+    if 'name_to_id' in format_types:
+        clashes = sorted(set(names) & {f'{name}_lookup.json' for name in names})
+        if (os.path.realpath(os.path.dirname(merged_file)) == os.path.realpath(input_dir)
+                and os.path.basename(merged_file) in names):
+            clashes.append(os.path.basename(merged_file))
+        if clashes:
+            logging.error(f"Lookup tables would overwrite: {', '.join(clashes)}")
+            raise ValueError(f"Lookup tables would overwrite: {', '.join(clashes)}")
+        lookup_files = {name: os.path.join(output_dir, f'{name}_lookup.json') for name in names}
+    os.makedirs(output_dir, exist_ok=True)
+
+    failures = 0
+    lookups = {}
+    workers = min(os.cpu_count() or 1, len(names))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(log_level,)) as pool:
+        futures = {
+            pool.submit(anonymize_file, os.path.join(input_dir, name), os.path.join(output_dir, name),
+                        format_types, config, io_backend, encoding, lookup_files.get(name)): name
+            for name in names
+        }
+        for future in as_completed(futures):
+            try:
+                lookups[futures[future]] = future.result()
+            except Exception as e:
+                logging.error(f"Failed to anonymize {futures[future]}: {e}")
+                failures += 1
+
+    # Each worker numbers names independently, so the merged table lists every file's ID for a name.
+    merged = {}
+    for name in sorted(lookups):
+        for original, anon_id in lookups[name].items():
+            merged.setdefault(original, {})[name] = anon_id
+    if merged:
+        save_lookup(merged, output_dir, merged_file)
+    return failures
 
 
 def setup_argparse():
@@ -168,11 +1109,15 @@ def setup_argparse():
         argparse.ArgumentParser: The argument parser.
     """
     parser = argparse.ArgumentParser(description='Anonymizes data by converting it to a different format.')
-    parser.add_argument('input_path', help='Path to the input file.')
-    parser.add_argument('output_path', help='Path to the output file.')
-    parser.add_argument('format_type', choices=['date_to_timestamp', 'name_to_id', 'email_to_fake', 'phone_to_fake', 'address_to_fake'],
-                        help='The type of anonymization to apply.')
+    parser.add_argument('input_path', help='Path to the input file, or a directory of files to anonymize in parallel.')
+    parser.add_argument('output_path', help='Path to the output file (or directory, if input_path is one).')
+    parser.add_argument('format_type', nargs='+', choices=list(_FORMAT_TYPES),
+                        help='The type of anonymization to apply. Several types are applied together in one pass.')
     parser.add_argument('--config', help='Path to a JSON configuration file.', required=False)
+    parser.add_argument('--io_backend', '--io-backend', choices=['sync', 'uring'], default='sync',
+                        help='How to read the input file. "uring" uses io_uring on Linux (falls back to "sync").')
+    parser.add_argument('--encoding', default=None,
+                        help='Encoding of the input file(s), e.g. utf-8. Skips automatic encoding detection.')
     parser.add_argument('--log_level', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL'], default='INFO', help='Set the logging level.')
     return parser
 
@@ -187,8 +1132,6 @@ def main():
     logging.getLogger().setLevel(args.log_level)
 
     try:
-        data = load_data(args.input_path)
-        
         config = {}
         if args.config:
             try:
@@ -204,20 +1147,14 @@ def main():
                 logging.error(f"Error loading config file: {e}")
                 raise
 
-        anonymizer = DataFormatAnonymizer(data, args.format_type, config)
-        anonymized_data = anonymizer.anonymize()
-
-        save_data(anonymized_data, args.output_path)
-        logging.info(f"Anonymization complete.  Output written to {args.output_path}")
-        
-        if args.format_type == 'name_to_id' and anonymizer.id_lookup:
-            lookup_file = os.path.splitext(args.output_path)[0] + '_lookup.json' #Lookup table saved to same base name.
-            try:
-                with open(lookup_file, 'w', encoding='utf-8') as f:
-                    json.dump(anonymizer.id_lookup, f, indent=4)
-                logging.info(f"Name to ID lookup table saved to {lookup_file}")
-            except Exception as e:
-                logging.error(f"Error saving lookup table: {e}")
+        if os.path.isdir(args.input_path):
+            failures = anonymize_directory(args.input_path, args.output_path, args.format_type, config,
+                                           args.io_backend, args.log_level, args.encoding)
+            if failures:
+                raise RuntimeError(f"{failures} file(s) could not be anonymized")
+        else:
+            anonymize_file(args.input_path, args.output_path, args.format_type, config, args.io_backend,
+                           args.encoding)
 
     except Exception as e:
         logging.critical(f"An error occurred: {e}")
@@ -225,4 +1162,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,124 @@
+"""
+Checks that user patterns keep their meaning when several format types are combined into one regex.
+
+Run from the repository root with `python -m unittest` (or `python -m pytest`).
+"""
+import logging
+import re
+import unittest
+
+import main
+
+
+def setUpModule():
+    logging.disable(logging.CRITICAL)  # Rejected patterns are logged on purpose.
+
+
+def tearDownModule():
+    logging.disable(logging.NOTSET)
+
+
+def _matches(anonymizer, text):
+    """(format key, matched text) for every match of the anonymizer's combined pattern."""
+    return [(match.lastgroup, match.group(0)) for match in anonymizer._combined.finditer(text)]
+
+
+class EmbeddableTest(unittest.TestCase):
+
+    def test_plain_pattern_is_unchanged(self):
+        self.assertEqual(main._embeddable('date', r'\d{4}-\d{2}-\d{2}'), r'\d{4}-\d{2}-\d{2}')
+
+    def test_leading_flags_are_scoped(self):
+        self.assertEqual(main._embeddable('email', r'(?i)[a-z]+@x\.com'), r'(?i:[a-z]+@x\.com)')
+        self.assertEqual(main._embeddable('email', r'(?i)(?s)a.b'), r'(?is:a.b)')
+
+    def test_verbose_comment_cannot_swallow_the_closing_parenthesis(self):
+        embedded = main._embeddable('email', '(?x) a b  # trailing comment')
+        self.assertEqual(re.compile(f'(?P<email>{embedded})|(?P<date>c)').findall('ab c'),
+                         [('ab', ''), ('', 'c')])
+
+    def test_numbered_backreference_is_rejected(self):
+        for pattern in (r'(\d{4})-\1', r'(a)?(?(1)b|c)', r'x\\\1'):
+            with self.assertRaises(ValueError, msg=pattern):
+                main._embeddable('date', pattern)
+
+    def test_escaped_backslash_is_not_a_backreference(self):
+        self.assertEqual(main._embeddable('date', r'a\\1b'), r'a\\1b')
+
+
+class CombinedPatternTest(unittest.TestCase):
+    TEXT = 'Meet John Smith on 2020-2020 at JOHN@X.COM, or call 555-123-4567.'
+
+    def test_inline_flag_in_combined_mode(self):
+        anonymizer = main.DataFormatAnonymizer(self.TEXT, ['name_to_id', 'email_to_fake'],
+                                               {'email_regex': r'(?i)\b[a-z]+@[a-z]+\.com\b'})
+        self.assertEqual(_matches(anonymizer, self.TEXT),
+                         [('name', 'Meet John'), ('email', 'JOHN@X.COM')])
+
+    def test_verbose_flag_in_combined_mode(self):
+        config = {'email_regex': '(?x) [A-Z]+ @ [A-Z]+ \\.COM  # upper-case only', 'allow_fancy_regex': True}
+        anonymizer = main.DataFormatAnonymizer(self.TEXT, ['name_to_id', 'email_to_fake'], config)
+        self.assertEqual(_matches(anonymizer, self.TEXT),
+                         [('name', 'Meet John'), ('email', 'JOHN@X.COM')])
+
+    def test_numbered_backreference_is_rejected_in_init(self):
+        config = {'date_regex': r'(\d{4})-\1', 'allow_fancy_regex': True}
+        with self.assertRaises(ValueError):
+            main.DataFormatAnonymizer(self.TEXT, ['name_to_id', 'date_to_timestamp'], config)
+        # On its own the same pattern is fine.
+        main.DataFormatAnonymizer(self.TEXT, 'date_to_timestamp', config)
+
+    def test_nested_named_groups_dispatch_on_the_outer_group(self):
+        config = {'date_regex': r'(?P<year>\d{4})-(?P=year)', 'allow_fancy_regex': True}
+        anonymizer = main.DataFormatAnonymizer(self.TEXT, ['name_to_id', 'date_to_timestamp'], config)
+        self.assertEqual(_matches(anonymizer, self.TEXT), [('name', 'Meet John'), ('date', '2020-2020')])
+
+    def test_clashing_group_names_are_rejected(self):
+        for config in ({'name_regex': r'(?P<name>[A-Z]\w+) Smith'},
+                       {'name_regex': r'(?P<g>[A-Z]\w+) Smith', 'phone_regex': r'(?P<g>\d{3})-\d{3}-\d{4}'}):
+            with self.assertRaises(ValueError, msg=config):
+                main.DataFormatAnonymizer(self.TEXT, ['name_to_id', 'phone_to_fake'], config)
+
+    def test_earlier_format_type_wins_overlaps(self):
+        text = 'call 2020-12-3145'
+        first = main.DataFormatAnonymizer(text, ['date_to_timestamp', 'phone_to_fake'],
+                                          {'phone_regex': r'\d{4}-\d{2}-\d{4}'})
+        self.assertEqual(_matches(first, text), [('date', '2020-12-31')])
+        second = main.DataFormatAnonymizer(text, ['phone_to_fake', 'date_to_timestamp'],
+                                           {'phone_regex': r'\d{4}-\d{2}-\d{4}'})
+        self.assertEqual(_matches(second, text), [('phone', '2020-12-3145')])
+
+
+@unittest.skipIf(main._re is re, "google-re2 is not installed")
+class MixedEngineTest(unittest.TestCase):
+    """A user pattern on RE2 combined with built-in patterns on re."""
+
+    CONFIG = {'date_regex': r'\d{4}/\d{2}/\d{2}', 'date_format': '%Y/%m/%d'}
+
+    def test_combined_pattern_uses_re2_and_dispatches_by_group(self):
+        text = 'Meet John Smith on 2024/01/01 at a@b.com'
+        anonymizer = main.DataFormatAnonymizer(text, ['name_to_id', 'date_to_timestamp', 'email_to_fake'],
+                                               self.CONFIG)
+        self.assertNotIsInstance(anonymizer._patterns['date'], re.Pattern)
+        self.assertNotIsInstance(anonymizer._combined, re.Pattern)
+        self.assertEqual(_matches(anonymizer, text),
+                         [('name', 'Meet John'), ('date', '2024/01/01'), ('email', 'a@b.com')])
+
+    def test_same_matches_as_re(self):
+        text = 'Ana Smith 2024/01/01, Bob Lee x@y.org 1999/12/31\n' * 3
+        keys = ['name_to_id', 'date_to_timestamp', 'email_to_fake']
+        on_re2 = main.DataFormatAnonymizer(text, keys, self.CONFIG)
+        on_re = main.DataFormatAnonymizer(text, keys, dict(self.CONFIG, allow_fancy_regex=True))
+        self.assertIsInstance(on_re._combined, re.Pattern)
+        self.assertEqual(_matches(on_re2, text), _matches(on_re, text))
+
+    def test_non_ascii_input_stays_on_re(self):
+        text = 'José Müller on 2024/01/01'
+        anonymizer = main.DataFormatAnonymizer(text, ['name_to_id', 'date_to_timestamp'],
+                                               dict(self.CONFIG, name_regex=r'\b[^\W\d]+\s[^\W\d]+\b'))
+        self.assertIsInstance(anonymizer._combined, re.Pattern)
+        self.assertEqual(_matches(anonymizer, text), [('name', 'José Müller'), ('date', '2024/01/01')])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,205 @@
+"""
+Randomized checks that the fast date_to_timestamp paths agree with the strptime/re.finditer reference.
+
+Run from the repository root with `python -m unittest` (or `python -m pytest`).
+"""
+import calendar
+import io
+import logging
+import os
+import random
+import re
+import time
+import unittest
+from datetime import datetime
+from unittest import mock
+
+import main
+
+_SEED = 20240101
+
+
+def setUpModule():
+    logging.disable(logging.CRITICAL)  # Invalid dates are logged on purpose.
+
+
+def tearDownModule():
+    logging.disable(logging.NOTSET)
+
+
+def _random_date_like(rng):
+    """A 'DDDD-DD-DD'-ish string: mostly well-formed, sometimes out of range or not digits at all."""
+    year = rng.choice(['0000', '1900', '1960', '1969', '1970', '1972', '2000', '2100', '9999',
+                       f'{rng.randint(0, 9999):04d}'])
+    month = f'{rng.randint(0, 13):02d}'
+    day = f'{rng.randint(0, 32):02d}'
+    date_str = f'{year}-{month}-{day}'
+    if rng.random() < 0.1:
+        i = rng.randrange(len(date_str))
+        date_str = date_str[:i] + rng.choice('+_ x-٣') + date_str[i + 1:]
+    return date_str
+
+
+def _random_text(rng, tokens, skip_year_1=False):
+    """Text dense in dates and digit/dash runs, so matches often overlap or abut."""
+    parts = []
+    for _ in range(tokens):
+        roll = rng.random()
+        if roll < 0.5:
+            date_str = _random_date_like(rng)
+            if skip_year_1 and date_str.startswith('0001'):
+                date_str = '2' + date_str[1:]
+            parts.append(date_str)
+        elif roll < 0.8:
+            parts.append(''.join(rng.choice('0123456789-') for _ in range(rng.randint(1, 14))))
+        else:
+            parts.append(rng.choice([' ', '\n', 'on ', 'x', '\r\n', ', ']))
+    return ''.join(parts)
+
+
+def _reference(data):
+    """What the original implementation produced: strptime plus naive datetime.timestamp()."""
+    def convert(match):
+        try:
+            return str(int(datetime.strptime(match.group(0), '%Y-%m-%d').timestamp()))
+        except ValueError:
+            return match.group(0)
+    return re.sub(r'\d{4}-\d{2}-\d{2}', convert, data)
+
+
+class IsoUtcTimestampTest(unittest.TestCase):
+
+    def test_matches_strptime(self):
+        rng = random.Random(_SEED)
+        for _ in range(50000):
+            date_str = _random_date_like(rng)
+            try:
+                expected = calendar.timegm(datetime.strptime(date_str, '%Y-%m-%d').timetuple())
+            except ValueError:
+                with self.assertRaises(ValueError, msg=date_str):
+                    main._iso_utc_timestamp(date_str)
+            else:
+                self.assertEqual(main._iso_utc_timestamp(date_str), expected, date_str)
+
+
+@unittest.skipIf(main.np is None, "numpy is not installed")
+class NumpyTimestampsTest(unittest.TestCase):
+
+    def test_matches_iso_utc_timestamp(self):
+        rng = random.Random(_SEED)
+        for _ in range(200):
+            batch = set()
+            for _ in range(rng.randint(1, 200)):
+                date_str = _random_date_like(rng)
+                try:
+                    main._iso_utc_timestamp(date_str)
+                except ValueError:
+                    continue
+                if main._is_iso_date_shape(date_str):
+                    batch.add(date_str)
+            expected = {date_str: str(main._iso_utc_timestamp(date_str)) for date_str in batch}
+            self.assertEqual(main._iso_timestamps_numpy(sorted(batch)), expected if batch else {})
+
+    def test_invalid_date_rejects_whole_batch(self):
+        self.assertEqual(main._iso_timestamps_numpy(['2024-01-01', '2024-02-30']), {})
+        self.assertEqual(main._iso_timestamps_numpy(['2024-01-01', '0000-01-01']), {})
+
+
+class DateScannerTest(unittest.TestCase):
+
+    def _texts(self):
+        rng = random.Random(_SEED)
+        return [_random_text(rng, rng.randint(0, 400)) for _ in range(300)]
+
+    @staticmethod
+    def _finditer_spans(text):
+        return [match.span() for match in main._DATE_RE.finditer(text)]
+
+    @unittest.skipIf(main.hyperscan is None, "hyperscan is not installed")
+    def test_hyperscan_matches_finditer(self):
+        for text in self._texts():
+            text = text.encode('ascii', 'replace').decode('ascii')
+            self.assertEqual(main._hyperscan_date_spans(text), self._finditer_spans(text))
+
+    def test_numba_matches_finditer(self):
+        scan_dates = main._numba_date_scanner()
+        if scan_dates is None:
+            self.skipTest("numba is not installed")
+        for text in self._texts():
+            text = text.encode('ascii', 'replace').decode('ascii')
+            starts = scan_dates(main.np.frombuffer(text.encode('ascii'), dtype=main.np.uint8)).tolist()
+            self.assertEqual([(start, start + 10) for start in starts], self._finditer_spans(text))
+
+
+class DateToTimestampTest(unittest.TestCase):
+    """Every conversion path, in several local timezones, against the original strptime behaviour."""
+
+    # Africa/Monrovia and Atlantic/Reykjavik are UTC today but not in the past.
+    TIMEZONES = ('UTC', 'America/New_York', 'Asia/Kolkata', 'Africa/Monrovia', 'Atlantic/Reykjavik')
+
+    def setUp(self):
+        self._saved_tz = os.environ.get('TZ')
+
+    def tearDown(self):
+        if self._saved_tz is None:
+            os.environ.pop('TZ', None)
+        else:
+            os.environ['TZ'] = self._saved_tz
+        time.tzset()
+
+    def _paths(self):
+        """(label, patches) for each way date_to_timestamp can run."""
+        paths = [('split', {'hyperscan': None, 'np': None})]
+        if main.np is not None:
+            paths.append(('numpy split', {'hyperscan': None, '_JIT_MIN_SIZE': float('inf')}))
+            if main._numba_date_scanner() is not None:
+                paths.append(('numba', {'hyperscan': None, '_JIT_MIN_SIZE': 0}))
+                # Any block with a date counts as dense, so blocks alternate between scanner and split.
+                paths.append(('numba back-off', {'hyperscan': None, '_JIT_MIN_SIZE': 0, '_SCAN_MIN_DATES': 0}))
+        if main.hyperscan is not None:
+            paths.append(('hyperscan', {}))
+            paths.append(('hyperscan back-off', {'_SCAN_MIN_DATES': 0}))
+        return paths
+
+    def _run(self, data, patches, stream, config=None):
+        with mock.patch.multiple(main, _STREAM_BLOCK_SIZE=64, **patches):
+            anonymizer = main.DataFormatAnonymizer(data, 'date_to_timestamp', config)
+            if not stream:
+                return anonymizer.anonymize()
+            out = io.StringIO()
+            anonymizer.anonymize_to(out)
+            return out.getvalue()
+
+    def test_paths_match_reference(self):
+        for tz in self.TIMEZONES:
+            os.environ['TZ'] = tz
+            time.tzset()
+            is_utc = main._local_tz_is_utc()
+            rng = random.Random(_SEED)
+            # Year 1 is the one known difference, covered by test_year_one below.
+            texts = [_random_text(rng, rng.randint(0, 300), skip_year_1=True) for _ in range(40)]
+            texts.append('é ' + texts[-1])  # Non-ASCII input takes the re-based paths.
+            with mock.patch.object(main, '_LOCAL_TZ_IS_UTC', is_utc):
+                for text in texts:
+                    expected = _reference(text)
+                    for label, patches in self._paths():
+                        for stream in (False, True):
+                            with self.subTest(tz=tz, path=label, stream=stream):
+                                self.assertEqual(self._run(text, patches, stream), expected)
+                    # A date_regex override always goes through re.sub with a callback.
+                    with self.subTest(tz=tz, path='callback'):
+                        self.assertEqual(self._run(text, {}, False, {'date_regex': r'\d{4}-\d{2}-\d{2}'}), expected)
+
+    def test_utc_detection(self):
+        for tz, expected in (('UTC', True), ('Etc/UTC', True), ('Africa/Monrovia', False),
+                             ('Atlantic/Reykjavik', False), ('Africa/Abidjan', False), ('Europe/London', False)):
+            os.environ['TZ'] = tz
+            time.tzset()
+            self.assertEqual(main._local_tz_is_utc(), expected, tz)
+
+    def test_year_one(self):
+        # datetime.timestamp() can't represent local midnight of 0001-01-01, so the original code left
+        # it unchanged; the integer arithmetic used when local time is UTC converts it.
+        with mock.patch.object(main, '_LOCAL_TZ_IS_UTC', True):
+            self.assertEqual(main.DataFormatAnonymizer('0001-01-01', 'date_to_timestamp').anonymize(),
+                             str(calendar.timegm((1, 1, 1, 0, 0, 0))))
@@ -0,0 +1,115 @@
+"""
+Checks anonymize_file and anonymize_directory on real files, including the lookup tables they write.
+
+Run from the repository root with `python -m unittest` (or `python -m pytest`).
+"""
+import json
+import logging
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import main
+
+
+def setUpModule():
+    logging.disable(logging.CRITICAL)
+
+
+def tearDownModule():
+    logging.disable(logging.NOTSET)
+
+
+def _write(path, text):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+
+
+def _read(path):
+    with open(path, encoding='utf-8') as f:
+        return f.read()
+
+
+class AnonymizeFileTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = self._tmp.name
+        self.path = os.path.join(self.root, 'data.txt')
+        _write(self.path, 'John Smith on 2024-01-01\n')
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_output_can_replace_the_input(self):
+        os.chmod(self.path, 0o640)
+        lookup = main.anonymize_file(self.path, self.path, ['name_to_id'], {})
+        self.assertEqual(_read(self.path), f"{lookup['John Smith']} on 2024-01-01\n")
+        self.assertEqual(os.stat(self.path).st_mode & 0o777, 0o640)
+        self.assertEqual(sorted(os.listdir(self.root)), ['data.txt', 'data_lookup.json'])
+
+    def test_failure_leaves_existing_output_untouched(self):
+        output_path = os.path.join(self.root, 'out.txt')
+        _write(output_path, 'previous run')
+        for path in (output_path, self.path):
+            with mock.patch.object(main.DataFormatAnonymizer, 'anonymize_to', side_effect=RuntimeError):
+                with self.assertRaises(RuntimeError):
+                    main.anonymize_file(self.path, path, ['date_to_timestamp'], {})
+        self.assertEqual(_read(output_path), 'previous run')
+        self.assertEqual(_read(self.path), 'John Smith on 2024-01-01\n')
+        self.assertEqual(sorted(os.listdir(self.root)), ['data.txt', 'out.txt'])
+
+    def test_symlinked_output_replaces_its_target(self):
+        target = os.path.join(self.root, 'target.txt')
+        link = os.path.join(self.root, 'link.txt')
+        _write(target, '')
+        os.symlink(target, link)
+        main.anonymize_file(self.path, link, ['date_to_timestamp'], {})
+        self.assertTrue(os.path.islink(link))
+        self.assertNotIn('2024-01-01', _read(target))
+
+
+class AnonymizeDirectoryTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = self._tmp.name
+        self.input_dir = os.path.join(self.root, 'in')
+        self.output_dir = os.path.join(self.root, 'out')
+        os.mkdir(self.input_dir)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_lookup_tables_are_merged(self):
+        _write(os.path.join(self.input_dir, 'a.txt'), 'John Smith met Jane Doe.\n')
+        _write(os.path.join(self.input_dir, 'b.txt'), 'Jane Doe again.\n')
+        self.assertEqual(main.anonymize_directory(self.input_dir, self.output_dir, ['name_to_id'], {}), 0)
+
+        per_file = {name: json.loads(_read(os.path.join(self.output_dir, f'{name}_lookup.json')))
+                    for name in ('a.txt', 'b.txt')}
+        merged = json.loads(_read(self.output_dir + '_lookup.json'))
+        self.assertEqual(merged, {
+            'John Smith': {'a.txt': per_file['a.txt']['John Smith']},
+            'Jane Doe': {'a.txt': per_file['a.txt']['Jane Doe'], 'b.txt': per_file['b.txt']['Jane Doe']},
+        })
+        for name, lookup in per_file.items():
+            output = _read(os.path.join(self.output_dir, name))
+            self.assertTrue(all(anon_id in output for anon_id in lookup.values()), name)
+
+    def test_no_merged_table_without_names(self):
+        _write(os.path.join(self.input_dir, 'a.txt'), 'nothing to see\n')
+        self.assertEqual(main.anonymize_directory(self.input_dir, self.output_dir, ['name_to_id'], {}), 0)
+        self.assertFalse(os.path.exists(self.output_dir + '_lookup.json'))
+
+    def test_merged_table_cannot_overwrite_an_input(self):
+        output_dir = os.path.join(self.input_dir, 'out')
+        _write(os.path.join(self.input_dir, 'out_lookup.json'), '{}')
+        with self.assertRaises(ValueError):
+            main.anonymize_directory(self.input_dir, output_dir, ['name_to_id'], {})
+        self.assertEqual(_read(os.path.join(self.input_dir, 'out_lookup.json')), '{}')
+
+
+if __name__ == '__main__':
+    unittest.main()